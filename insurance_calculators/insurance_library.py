@@ -0,0 +1,441 @@
+"""Endowment insurance pricing library.
+
+Prices level-premium endowment policies from the SSA 2025 Trustees Report
+death probability tables (Alternative 2). This is the plain-Python library
+behind the Streamlit calculator in life_insurance_calculator.py.
+"""
+
+import os
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+try:
+    from numba import njit
+except ImportError:  # pragma: no cover - numba is optional
+    njit = None
+
+
+_DATA_DIR = os.path.dirname(os.path.abspath(__file__))
+
+GENDER_IDX = {'female': 0, 'male': 1}
+
+
+_QX_CACHE = os.path.join(_DATA_DIR, 'qx_2025.npz')
+_CSV_FILES = ('DeathProbsE_F_Alt2_TR2025.csv', 'DeathProbsE_M_Alt2_TR2025.csv')
+
+
+def _load_cached_table():
+    """Packed qx table from qx_2025.npz, or None if stale or missing.
+
+    np.load of the sidecar is sub-millisecond versus hundreds of
+    milliseconds of CSV parsing, so cold starts skip pandas entirely once
+    the cache exists.
+    """
+    try:
+        cache_mtime = os.path.getmtime(_QX_CACHE)
+        for filename in _CSV_FILES:
+            if cache_mtime < os.path.getmtime(os.path.join(_DATA_DIR, filename)):
+                return None
+        with np.load(_QX_CACHE) as cached:
+            return cached['table']
+    except (OSError, KeyError):
+        return None
+
+
+def _read_qx_row(filename, year=2025):
+    """qx-by-age array for one SSA table's `year` row, parsed without pandas.
+
+    Only one row per file is ever used, so a DataFrame of the whole table is
+    wasted work; this scans for the row and splits it directly.
+    """
+    path = os.path.join(_DATA_DIR, filename)
+    with open(path) as fh:
+        fh.readline()  # title line
+        header = fh.readline().strip().split(',')
+        for line in fh:
+            fields = line.strip().split(',')
+            if fields[0] == str(year):
+                break
+        else:
+            raise ValueError(f'{filename}: no row for year {year}')
+    arr = np.zeros(121)
+    for name, value in zip(header[1:], fields[1:]):
+        if name.isdigit():
+            arr[int(name)] = float(value)
+    return arr
+
+
+@lru_cache(maxsize=1)
+def load_death_probabilities():
+    """Load the 2025 death probability row for each gender from the SSA CSVs."""
+    table = _load_cached_table()
+    if table is not None:
+        return table
+
+    # One contiguous (gender, age) table: qx for age a lives at column a.
+    # float32 keeps the whole table in L1 and the CSVs only carry ~6
+    # significant digits anyway.
+    table = np.zeros((2, 121), dtype=np.float32)
+    table[GENDER_IDX['female']] = _read_qx_row(_CSV_FILES[0])
+    table[GENDER_IDX['male']] = _read_qx_row(_CSV_FILES[1])
+    try:
+        np.savez(_QX_CACHE, table=table)
+    except OSError:  # pragma: no cover - read-only deployments
+        pass
+    return table
+
+
+def get_death_probability(data, age, gender):
+    """Probability of dying at exactly `age` for the given gender."""
+    # Canonical case: the (gender, age) table from load_death_probabilities.
+    try:
+        return data[GENDER_IDX[str(gender).lower()], age]
+    except (KeyError, TypeError, IndexError):
+        return _get_probability_slow(data, age, gender)
+
+
+_SERIES_DICTS = {}
+
+
+def _series_as_dict(series):
+    """Plain {age: qx} dict for a legacy Series, built once per object.
+
+    The tuple value pins the Series so its id() cannot be recycled while the
+    cache entry lives; repeat lookups on the same Series are then a single
+    dict probe instead of a per-call set_axis relabel.
+    """
+    cached = _SERIES_DICTS.get(id(series))
+    if cached is not None and cached[0] is series:
+        return cached[1]
+    qx = {int(col): float(val) for col, val in series.items()
+          if str(col).isdigit() and pd.notna(val)}
+    _SERIES_DICTS[id(series)] = (series, qx)
+    return qx
+
+
+def _get_probability_slow(data, age, gender):
+    """Compatibility path for callers still holding a raw pandas Series."""
+    if isinstance(data, dict):
+        series = data[str(gender).lower()]
+    else:
+        series = data
+    if isinstance(series, np.ndarray):
+        return float(series[int(age)]) if int(age) < len(series) else 0.0
+    if not str(age).isdigit():
+        return 0.0
+    return _series_as_dict(series).get(int(age), 0.0)
+
+
+@lru_cache(maxsize=1024)
+def accumulated_annuity(periods, intrest, type):
+    """Accumulated value of an annuity of 1 per period at the given rate.
+
+    Memoized: the UI evaluates the same (periods, rate) pairs repeatedly on
+    every slider tick, so repeat calls are a dict hit.
+    """
+    factor = ((1 + intrest) ** periods - 1) / intrest
+    if type == 1:
+        return factor
+    # the old pow((1 - 1/i), -1) denominator is just i/(i - 1)
+    return factor * intrest / (intrest - 1)
+
+
+def _mortality_row(death_data, gender):
+    """Per-age qx ndarray for one gender, normalized from any supported layout.
+
+    Hoists the array conversion out of the kernels: the packed table is a
+    plain row view, while legacy dict-of-Series inputs are converted to an
+    ndarray once instead of paying Series dispatch per year.
+    """
+    if isinstance(death_data, np.ndarray) and death_data.ndim == 2:
+        return death_data[GENDER_IDX[str(gender).lower()]]
+    if isinstance(death_data, dict):
+        death_data = death_data[str(gender).lower()]
+    if isinstance(death_data, pd.Series):
+        # Place values by their age labels: the 2025 row Series still carries
+        # its Year label, so a positional asarray would shift every qx one
+        # slot late.
+        arr = np.zeros(121)
+        for age, value in _series_as_dict(death_data).items():
+            if age < arr.size:
+                arr[age] = value
+        return arr
+    return np.asarray(death_data, dtype=np.float64)
+
+
+@lru_cache(maxsize=2)
+def _qx(gender):
+    """Cached per-gender qx row for the calculator entry points.
+
+    lru_cache rather than a Streamlit cache so batch scripts and tests get
+    the same amortization; the loader itself is already memoized, this just
+    skips re-normalizing the row per call.
+    """
+    return _mortality_row(load_death_probabilities(), gender)
+
+
+def _compute_curves(mort, current_age, payout_age, intrest):
+    """One pass over the mortality array shared by premium and risk tolerance.
+
+    Returns (annuity factors, death probability by year, running death CDF)
+    as arrays over the policy years.
+    """
+    n = payout_age - current_age
+    k = np.arange(n)
+    # expm1/log1p form of ((1+i)**k - 1)/i: one ufunc pass, and it keeps
+    # precision when the rate slider sits near zero.
+    annuity = np.expm1(k * np.log1p(intrest)) / intrest
+    q = mort[current_age:payout_age].copy()
+    survival = np.empty(n)
+    survival[0] = 1.0
+    np.cumprod(1 - q[:-1], out=survival[1:])
+    prob_death_and_age = survival * q
+    # Endowment: the final term covers everyone who reached the last year
+    prob_death_and_age[-1] = survival[-1]
+    return annuity, prob_death_and_age, np.cumsum(prob_death_and_age)
+
+
+def _premium_core_py(mort, current_age, payout_age, intrest, payout):
+    """Vectorized premium kernel used when numba is not installed."""
+    annuity, prob_death_and_age, cdf_cum = _compute_curves(
+        mort, current_age, payout_age, intrest)
+    prenium = payout / (annuity * prob_death_and_age).sum()
+    return prenium, cdf_cum[-1]
+
+
+if njit is not None:
+    @njit(cache=True, fastmath=True)
+    def _premium_core(mort, current_age, payout_age, intrest, payout):
+        # Fetch the current year's q first, then roll survival forward: the
+        # old lagged q_prev form wasted a multiply on the first iteration and
+        # obscured that surv is simply the probability of reaching this year.
+        surv = 1.0
+        # annuity factor recurrence af_{k+1} = af_k*(1+i) + 1, so no power
+        # or division is needed inside the loop
+        annuity_factor = 0.0
+        weighted_total_annuity = 0.0
+        death_cdf = 0.0
+        # Death years only in the loop; the endowment tail (everyone who
+        # reached the final year) is handled once after it, so the body is
+        # branchless and vectorizes cleanly.
+        for evaluation_age in range(current_age, payout_age - 1):
+            q = mort[evaluation_age]
+            prob_death_and_age = surv * q
+            death_cdf += prob_death_and_age
+            weighted_total_annuity += annuity_factor * prob_death_and_age
+            surv *= 1.0 - q
+            annuity_factor = annuity_factor * (1.0 + intrest) + 1.0
+            # Whole-life-style terms spend their tail multiplying negligible
+            # survivorship; anything below this tolerance cannot move the
+            # premium at float precision.
+            if surv < 1.0e-15:
+                break
+        death_cdf += surv
+        weighted_total_annuity += annuity_factor * surv
+        return payout / weighted_total_annuity, death_cdf
+
+    @njit(cache=True, fastmath=True)
+    def _price_risk_core(mort, current_age, payout_age, intrest, payout):
+        # Fused (premium, death CDF, break-even CDF): price first, then one
+        # more pass over the same recurrences to find the first year where
+        # accumulated premiums exceed the payout. Mirrors the vectorized
+        # price_and_risk path without materializing any arrays.
+        prenium, death_cdf = _premium_core(mort, current_age, payout_age,
+                                           intrest, payout)
+        surv = 1.0
+        annuity_factor = 0.0
+        cdf = 0.0
+        break_even = -1.0
+        for evaluation_age in range(current_age, payout_age - 1):
+            q = mort[evaluation_age]
+            prob_death_and_age = surv * q
+            cdf += prob_death_and_age
+            if break_even < 0.0 and prenium * annuity_factor > payout:
+                break_even = cdf
+            surv *= 1.0 - q
+            annuity_factor = annuity_factor * (1.0 + intrest) + 1.0
+        cdf += surv
+        if break_even < 0.0:
+            # Crossing in (or after) the final year; clamp to it like the
+            # searchsorted path does.
+            break_even = cdf
+        return prenium, death_cdf, break_even
+
+else:
+    try:
+        # AOT-compiled Cython kernel (see kernels.pyx / setup.py); same
+        # recurrence without a runtime JIT dependency.
+        from kernels import premium_core as _premium_core
+    except ImportError:  # pragma: no cover - extension not built
+        _premium_core = None
+    _price_risk_core = None
+
+
+@lru_cache(maxsize=None)
+def specialize_premium_kernel(years):
+    """Premium kernel unrolled at runtime for a fixed term length.
+
+    Partial evaluation for batch callers that re-price many policies with the
+    same term: the loop disappears into straight-line code with the year
+    offsets baked in as constants, which compilers can schedule as one FMA
+    chain. Returns kernel(mort, current_age, intrest, payout) ->
+    (premium, death_cdf), numba-compiled when available.
+
+    Memoized per term; the first call for a given `years` pays codegen (and a
+    JIT compile under numba), so this is not used on the interactive path —
+    calculate_premium's generic kernel stays latency-free there.
+    """
+    lines = [
+        'def kernel(mort, current_age, intrest, payout):',
+        '    one_plus_i = 1.0 + intrest',
+        '    surv = 1.0',
+        '    annuity_factor = 0.0',
+        '    weighted_total_annuity = 0.0',
+        '    death_cdf = 0.0',
+    ]
+    for k in range(years - 1):
+        lines += [
+            f'    q = mort[current_age + {k}]',
+            '    prob_death_and_age = surv * q',
+            '    death_cdf += prob_death_and_age',
+            '    weighted_total_annuity += annuity_factor * prob_death_and_age',
+            '    surv *= 1.0 - q',
+            '    annuity_factor = annuity_factor * one_plus_i + 1.0',
+        ]
+    lines += [
+        '    death_cdf += surv',
+        '    weighted_total_annuity += annuity_factor * surv',
+        '    return payout / weighted_total_annuity, death_cdf',
+    ]
+    namespace = {}
+    exec('\n'.join(lines), namespace)
+    kernel = namespace['kernel']
+    if njit is not None:
+        # cache=True needs an on-disk source file, which generated code
+        # doesn't have; the lru_cache keeps the compiled kernel alive instead.
+        kernel = njit(fastmath=True)(kernel)
+    return kernel
+
+
+def calculate_premium(current_age, payout_age, intrest, payout, gender):
+    """Annual premium so accumulated premiums cover the payout in expectation."""
+    mort = _qx(gender)
+
+    if _premium_core is not None:
+        prenium, _death_cdf = _premium_core(mort, current_age, payout_age,
+                                            intrest, payout)
+    else:
+        prenium, _death_cdf = _premium_core_py(mort, current_age, payout_age,
+                                               intrest, payout)
+    return prenium
+
+
+def calculate_premium_batch(ages, payout_ages, intrest, payout, gender):
+    """Price many (current_age, payout_age) scenarios in one 2-D pass.
+
+    `ages` and `payout_ages` are equal-length sequences; returns an array of
+    annual premiums, one per scenario. Scenarios shorter than the longest term
+    are zero-padded so the whole grid reduces with a single cumprod/sum.
+    """
+    mort = _qx(gender)
+
+    ages = np.asarray(ages, dtype=np.intp)
+    payout_ages = np.asarray(payout_ages, dtype=np.intp)
+    terms = payout_ages - ages
+    t_max = int(terms.max())
+    k = np.arange(t_max)
+    annuity = ((1 + intrest) ** k - 1) / intrest
+
+    # q[s, t] is the death probability at age ages[s]+t, zeroed past each
+    # scenario's own term so padded years contribute nothing.
+    idx = ages[:, None] + k[None, :]
+    in_term = k[None, :] < terms[:, None]
+    q = np.where(in_term, mort[np.minimum(idx, len(mort) - 1)], 0.0)
+
+    survival = np.ones_like(q)
+    np.cumprod(1 - q[:, :-1], axis=1, out=survival[:, 1:])
+    prob_death_and_age = survival * q
+    # Endowment: overwrite each scenario's final year with its survival
+    rows = np.arange(len(ages))
+    prob_death_and_age[rows, terms - 1] = survival[rows, terms - 1]
+
+    weighted = (annuity[None, :] * prob_death_and_age).sum(axis=1)
+    return payout / weighted
+
+
+def calculate_premium_by_gender(current_age, payout_age, intrest, payout):
+    """Premiums for both genders from one 2-D pass over the packed table.
+
+    The qx table already stacks the female and male rows, so the cumprod and
+    annuity reductions run once along axis 1 instead of once per gender.
+    Returns {'female': premium, 'male': premium}.
+    """
+    table = np.asarray(load_death_probabilities(), dtype=np.float64)
+
+    n = payout_age - current_age
+    k = np.arange(n)
+    annuity = np.expm1(k * np.log1p(intrest)) / intrest
+    q = table[:, current_age:payout_age]
+
+    survival = np.ones_like(q)
+    np.cumprod(1 - q[:, :-1], axis=1, out=survival[:, 1:])
+    prob_death_and_age = survival * q
+    # Endowment: the final term covers everyone who reached the last year
+    prob_death_and_age[:, -1] = survival[:, -1]
+
+    weighted = (annuity[None, :] * prob_death_and_age).sum(axis=1)
+    return {gender: payout / weighted[row] for gender, row in GENDER_IDX.items()}
+
+
+def _break_even_cdf(annuity, cdf_cum, prenium, payout):
+    """Death CDF at the first year accumulated premiums exceed the payout.
+
+    prenium * annuity is monotone in the year, so the crossing is a single
+    O(log n) searchsorted rather than a Python-level threshold scan.
+    """
+    idx = np.searchsorted(prenium * annuity, payout, side='right')
+    return float(cdf_cum[min(idx, len(cdf_cum) - 1)])
+
+
+def price_and_risk(current_age, payout_age, intrest, payout, gender):
+    """Premium, death CDF, and break-even CDF from a single traversal.
+
+    Fuses calculate_premium and calculate_risk_tolerance: the curves are
+    computed once, the premium falls out of the weighted annuity sum, and the
+    break-even search reuses the same annuity and CDF arrays.
+    """
+    mort = _qx(gender)
+
+    if _price_risk_core is not None:
+        prenium, death_cdf, break_even = _price_risk_core(
+            mort, current_age, payout_age, intrest, payout)
+        return prenium, death_cdf, break_even
+
+    annuity, prob_death_and_age, cdf_cum = _compute_curves(
+        mort, current_age, payout_age, intrest)
+    prenium = payout / (annuity * prob_death_and_age).sum()
+    break_even = _break_even_cdf(annuity, cdf_cum, prenium, payout)
+    return prenium, float(cdf_cum[-1]), break_even
+
+
+def calculate_risk_tolerance(current_age, payout_age, intrest, payout, prenium, gender):
+    """Probability the insured dies before their premiums have covered the payout."""
+    mort = _qx(gender)
+
+    annuity, prob_death_and_age, cdf_cum = _compute_curves(
+        mort, current_age, payout_age, intrest)
+    return _break_even_cdf(annuity, cdf_cum, prenium, payout)
+
+
+if __name__ == "__main__":
+    current_age = 20
+    payout_age = 65
+    intrest = 0.05
+    payout = 100000
+    gender = 'male'
+    prenium = calculate_premium(current_age, payout_age, intrest, payout, gender)
+    print(prenium)
+    print(calculate_risk_tolerance(current_age, payout_age, intrest, payout,
+                                   prenium, gender))
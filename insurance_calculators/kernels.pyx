@@ -0,0 +1,40 @@
+# cython: language_level=3, boundscheck=False, wraparound=False, cdivision=True
+"""AOT-compiled premium kernel for environments without Numba.
+
+Build in place with:
+
+    python setup.py build_ext --inplace
+
+insurance_library prefers Numba when it is importable, then this extension,
+then the pure-NumPy path, so building it is optional.
+"""
+
+ctypedef fused floating:
+    float
+    double
+
+
+def premium_core(floating[::1] mort, int current_age, int payout_age,
+                 double intrest, double payout):
+    """Scalar premium recurrence; mirrors insurance_library._premium_core."""
+    cdef double surv = 1.0
+    # annuity factor recurrence af_{k+1} = af_k*(1+i) + 1, so no power or
+    # division is needed inside the loop
+    cdef double annuity_factor = 0.0
+    cdef double weighted_total_annuity = 0.0
+    cdef double death_cdf = 0.0
+    cdef double q, prob_death_and_age
+    cdef int evaluation_age
+    # Branchless body: death years in the loop, endowment tail once after it.
+    for evaluation_age in range(current_age, payout_age - 1):
+        q = mort[evaluation_age]
+        prob_death_and_age = surv * q
+        death_cdf += prob_death_and_age
+        weighted_total_annuity += annuity_factor * prob_death_and_age
+        surv *= 1.0 - q
+        annuity_factor = annuity_factor * (1.0 + intrest) + 1.0
+        if surv < 1.0e-15:
+            break
+    death_cdf += surv
+    weighted_total_annuity += annuity_factor * surv
+    return payout / weighted_total_annuity, death_cdf
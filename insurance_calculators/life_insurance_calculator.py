@@ -0,0 +1,376 @@
+"""Streamlit endowment insurance calculator.
+
+Interactive front end for the endowment pricing math, deployed on Streamlit
+Cloud and linked from endowment_calculator_splash_page.html.
+"""
+
+import os
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+
+_DATA_DIR = os.path.dirname(os.path.abspath(__file__))
+
+GENDER_IDX = {'female': 0, 'male': 1}
+
+
+_QX_CACHE = os.path.join(_DATA_DIR, 'qx_2025.npz')
+_CSV_FILES = ('DeathProbsE_F_Alt2_TR2025.csv', 'DeathProbsE_M_Alt2_TR2025.csv')
+
+
+def _load_cached_table():
+    """Packed qx table from qx_2025.npz, or None if stale or missing.
+
+    np.load of the sidecar is sub-millisecond versus hundreds of
+    milliseconds of CSV parsing, so cold starts skip pandas entirely once
+    the cache exists.
+    """
+    try:
+        cache_mtime = os.path.getmtime(_QX_CACHE)
+        for filename in _CSV_FILES:
+            if cache_mtime < os.path.getmtime(os.path.join(_DATA_DIR, filename)):
+                return None
+        with np.load(_QX_CACHE) as cached:
+            return cached['table']
+    except (OSError, KeyError):
+        return None
+
+
+def _read_qx_row(filename, year=2025):
+    """qx-by-age array for one SSA table's `year` row, parsed without pandas.
+
+    Only one row per file is ever used, so a DataFrame of the whole table is
+    wasted work; this scans for the row and splits it directly.
+    """
+    path = os.path.join(_DATA_DIR, filename)
+    with open(path) as fh:
+        fh.readline()  # title line
+        header = fh.readline().strip().split(',')
+        for line in fh:
+            fields = line.strip().split(',')
+            if fields[0] == str(year):
+                break
+        else:
+            raise ValueError(f'{filename}: no row for year {year}')
+    arr = np.zeros(121)
+    for name, value in zip(header[1:], fields[1:]):
+        if name.isdigit():
+            arr[int(name)] = float(value)
+    return arr
+
+
+@st.cache_resource
+def load_death_probabilities():
+    """Load the 2025 death probability row for each gender from the SSA CSVs.
+
+    cache_resource returns the same table by reference on every rerun;
+    cache_data would deep-copy it each time for mutation safety. The table is
+    read-only by convention — callers must not write to it.
+    """
+    table = _load_cached_table()
+    if table is not None:
+        return table
+
+    # One contiguous (gender, age) table: qx for age a lives at column a.
+    # float32 keeps the whole table in L1 and the CSVs only carry ~6
+    # significant digits anyway.
+    table = np.zeros((2, 121), dtype=np.float32)
+    table[GENDER_IDX['female']] = _read_qx_row(_CSV_FILES[0])
+    table[GENDER_IDX['male']] = _read_qx_row(_CSV_FILES[1])
+    try:
+        np.savez(_QX_CACHE, table=table)
+    except OSError:  # pragma: no cover - read-only deployments
+        pass
+    return table
+
+
+@st.cache_resource
+def get_qx_arrays():
+    """Per-gender views of the packed qx table, keyed by gender name.
+
+    Convenience for callers that want named arrays rather than the raw
+    (gender, age) table; index is literal age. cache_resource so hits are
+    pointer fetches — cache_data would pickle-copy the arrays on every call.
+    Read-only by the same convention as load_death_probabilities.
+    """
+    table = load_death_probabilities()
+    return {'female': table[GENDER_IDX['female']],
+            'male': table[GENDER_IDX['male']]}
+
+
+def get_death_probability(data, age, gender):
+    """Probability of dying at exactly `age` for the given gender."""
+    # Canonical case: the (gender, age) table from load_death_probabilities.
+    try:
+        return data[GENDER_IDX[str(gender).lower()], age]
+    except (KeyError, TypeError, IndexError):
+        return _get_probability_slow(data, age, gender)
+
+
+_SERIES_DICTS = {}
+
+
+def _series_as_dict(series):
+    """Plain {age: qx} dict for a legacy Series, built once per object.
+
+    The tuple value pins the Series so its id() cannot be recycled while the
+    cache entry lives; repeat lookups on the same Series are then a single
+    dict probe instead of a per-call set_axis relabel.
+    """
+    cached = _SERIES_DICTS.get(id(series))
+    if cached is not None and cached[0] is series:
+        return cached[1]
+    qx = {int(col): float(val) for col, val in series.items()
+          if str(col).isdigit() and pd.notna(val)}
+    _SERIES_DICTS[id(series)] = (series, qx)
+    return qx
+
+
+def _get_probability_slow(data, age, gender):
+    """Compatibility path for callers still holding a raw pandas Series."""
+    if isinstance(data, dict):
+        series = data[str(gender).lower()]
+    else:
+        series = data
+    if isinstance(series, np.ndarray):
+        return float(series[int(age)]) if int(age) < len(series) else 0.0
+    if not str(age).isdigit():
+        return 0.0
+    return _series_as_dict(series).get(int(age), 0.0)
+
+
+@lru_cache(maxsize=1024)
+def accumulated_annuity(periods, intrest, type):
+    """Accumulated value of an annuity of 1 per period at the given rate.
+
+    Memoized: the UI evaluates the same (periods, rate) pairs repeatedly on
+    every slider tick, so repeat calls are a dict hit.
+    """
+    factor = ((1 + intrest) ** periods - 1) / intrest
+    if type == 1:
+        return factor
+    # the old pow((1 - 1/i), -1) denominator is just i/(i - 1)
+    return factor * intrest / (intrest - 1)
+
+
+def _mortality_row(death_data, gender):
+    """Per-age qx ndarray for one gender, normalized from any supported layout.
+
+    Hoists the array conversion out of the kernels: the packed table is a
+    plain row view, while legacy dict-of-Series inputs are converted to an
+    ndarray once instead of paying Series dispatch per year.
+    """
+    if isinstance(death_data, np.ndarray) and death_data.ndim == 2:
+        return death_data[GENDER_IDX[str(gender).lower()]]
+    if isinstance(death_data, dict):
+        death_data = death_data[str(gender).lower()]
+    if isinstance(death_data, pd.Series):
+        # Place values by their age labels: the 2025 row Series still carries
+        # its Year label, so a positional asarray would shift every qx one
+        # slot late.
+        arr = np.zeros(121)
+        for age, value in _series_as_dict(death_data).items():
+            if age < arr.size:
+                arr[age] = value
+        return arr
+    return np.asarray(death_data, dtype=np.float64)
+
+
+def _compute_curves(mort, current_age, payout_age, intrest):
+    """One pass over the mortality array shared by premium and risk tolerance.
+
+    Returns (annuity factors, death probability by year, running death CDF)
+    as arrays over the policy years.
+    """
+    n = payout_age - current_age
+    k = np.arange(n)
+    # expm1/log1p form of ((1+i)**k - 1)/i: one ufunc pass, and it keeps
+    # precision when the rate slider sits near zero.
+    annuity = np.expm1(k * np.log1p(intrest)) / intrest
+    q = mort[current_age:payout_age].copy()
+    survival = np.empty(n)
+    survival[0] = 1.0
+    np.cumprod(1 - q[:-1], out=survival[1:])
+    prob_death_and_age = survival * q
+    # Endowment: the final term covers everyone who reached the last year
+    prob_death_and_age[-1] = survival[-1]
+    return annuity, prob_death_and_age, np.cumsum(prob_death_and_age)
+
+
+def calculate_premium(current_age, payout_age, intrest, payout, gender,
+                      death_data=None):
+    """Annual premium so accumulated premiums cover the payout in expectation."""
+    if death_data is None:
+        death_data = load_death_probabilities()
+    mort = _mortality_row(death_data, gender)
+
+    annuity, prob_death_and_age, cdf_cum = _compute_curves(
+        mort, current_age, payout_age, intrest)
+    prenium = payout / (annuity * prob_death_and_age).sum()
+    return prenium
+
+
+def _break_even_cdf(annuity, cdf_cum, prenium, payout):
+    """Death CDF at the first year accumulated premiums exceed the payout.
+
+    prenium * annuity is monotone in the year, so the crossing is a single
+    O(log n) searchsorted rather than a Python-level threshold scan.
+    """
+    idx = np.searchsorted(prenium * annuity, payout, side='right')
+    return float(cdf_cum[min(idx, len(cdf_cum) - 1)])
+
+
+def price_and_risk(current_age, payout_age, intrest, payout, gender,
+                   death_data=None):
+    """Premium, death CDF, and break-even CDF from a single traversal.
+
+    Fuses calculate_premium and calculate_risk_tolerance: the curves are
+    computed once, the premium falls out of the weighted annuity sum, and the
+    break-even search reuses the same annuity and CDF arrays.
+    """
+    if death_data is None:
+        death_data = load_death_probabilities()
+    mort = _mortality_row(death_data, gender)
+
+    annuity, prob_death_and_age, cdf_cum = _compute_curves(
+        mort, current_age, payout_age, intrest)
+    prenium = payout / (annuity * prob_death_and_age).sum()
+    break_even = _break_even_cdf(annuity, cdf_cum, prenium, payout)
+    return prenium, float(cdf_cum[-1]), break_even
+
+
+def calculate_risk_tolerance(current_age, payout_age, intrest, payout, prenium,
+                             gender, death_data=None):
+    """Probability the insured dies before their premiums have covered the payout."""
+    if death_data is None:
+        death_data = load_death_probabilities()
+    mort = _mortality_row(death_data, gender)
+
+    annuity, prob_death_and_age, cdf_cum = _compute_curves(
+        mort, current_age, payout_age, intrest)
+    return _break_even_cdf(annuity, cdf_cum, prenium, payout)
+
+
+@st.cache_data(show_spinner=False)
+def _price_and_risk_per_unit(current_age, payout_age, intrest, gender,
+                             _death_data=None):
+    """Cached pricing for a payout of 1.
+
+    The premium is linear in the payout and the two CDFs are invariant to it,
+    so caching the unit result keeps cache hits across payout slider changes
+    and repeat renders return without touching the curves at all. The leading
+    underscore keeps the table out of Streamlit's cache key hashing.
+    """
+    return price_and_risk(current_age, payout_age, intrest, 1.0, gender,
+                          _death_data)
+
+
+# Static page chrome, built once at import: Streamlit re-executes the whole
+# script on every widget event, so anything inline would be reallocated per
+# rerun.
+_CSS = """
+    <style>
+    .main .block-container {
+        max-width: 860px;
+        padding-top: 2rem;
+    }
+    div[data-testid="stMetricValue"] {
+        font-size: 1.6rem;
+        color: #667eea;
+    }
+    .stButton > button {
+        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+        color: white;
+        border: none;
+    }
+    </style>
+"""
+
+_INTRO = """
+    **What is endowment insurance?**
+
+    Endowment insurance combines life insurance protection with a savings
+    component: it guarantees a lump sum payout either at policy maturity or
+    upon death, whichever comes first. Premiums below are computed from the
+    2025 SSA death probability tables (Alternative 2).
+"""
+
+_DISCLAIMER = """
+    **Disclaimer:** this calculator is an educational tool. It ignores
+    expenses, lapses, taxes and underwriting, and is not a quote for any
+    real insurance product.
+"""
+
+
+def run_premium_calculator():
+    st.set_page_config(page_title="Endowment Insurance Calculator",
+                       page_icon="💰", layout="centered")
+
+    st.markdown(_CSS, unsafe_allow_html=True)
+
+    st.title("💰 Endowment Insurance Calculator")
+
+    st.info(_INTRO)
+
+    death_data = load_death_probabilities()
+
+    # Batch the inputs in a form: Streamlit reruns the script on every widget
+    # event, so without it dragging a slider would reprice at each notch.
+    with st.form("inputs"):
+        gender = st.selectbox("Gender", ["male", "female"])
+        current_age = st.slider("Current age", 18, 80, 30)
+        payout_age = st.slider("Payout age", 19, 100, 65)
+        interest = st.slider("Annual interest rate", 0.01, 0.10, 0.05, step=0.005)
+        payout = st.number_input("Payout amount ($)", 10000, 5000000, 100000,
+                                 step=10000)
+        submitted = st.form_submit_button("Calculate premium")
+
+    if not submitted:
+        return
+
+    # Form widgets can't constrain each other mid-edit, so validate here.
+    if payout_age <= current_age:
+        st.error("Payout age must be greater than current age.")
+        return
+
+    years = payout_age - current_age
+
+    unit_premium, death_cdf, risk = _price_and_risk_per_unit(
+        current_age, payout_age, interest, gender, _death_data=death_data)
+    prenium = unit_premium * payout
+
+    col1, col2 = st.columns(2)
+    with col1:
+        st.metric("Annual premium", f"${prenium:,.2f}")
+    with col2:
+        st.metric("Break-even death probability", f"{risk:.1%}")
+
+    accumulated_value = prenium * accumulated_annuity(years, interest, 1)
+    st.metric(f"Accumulated value at age {payout_age}", f"${accumulated_value:,.2f}")
+
+    growth = [prenium * accumulated_annuity(k, interest, 1) for k in range(years + 1)]
+    st.line_chart(pd.DataFrame({"Accumulated premiums ($)": growth},
+                               index=range(current_age, payout_age + 1)))
+
+    with st.expander("How is this calculated?"):
+        st.markdown(f"""
+            The premium is set so that the expected accumulated value of your
+            premiums at {interest:.1%} interest equals the payout:
+
+            - Each year's death probability comes from the SSA 2025 tables.
+            - Premiums accumulate at a factor of
+              `{accumulated_annuity(years, interest, 1):,.2f}` over {years} years.
+            - The break-even probability is the chance of dying before your
+              accumulated premiums exceed the payout.
+        """)
+
+    st.warning(_DISCLAIMER)
+
+
+if __name__ == "__main__":
+    # `streamlit run` executes this file as __main__, so the app still starts;
+    # plain imports no longer trigger a full render.
+    run_premium_calculator()
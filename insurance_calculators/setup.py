@@ -0,0 +1,12 @@
+"""Optional build for the Cython premium kernel.
+
+Usage: python setup.py build_ext --inplace
+"""
+
+from setuptools import setup
+from Cython.Build import cythonize
+
+setup(
+    name="insurance-kernels",
+    ext_modules=cythonize(["kernels.pyx"]),
+)